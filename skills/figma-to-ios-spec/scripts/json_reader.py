@@ -4,18 +4,213 @@
 from __future__ import annotations
 
 import argparse
+import gc
+import hashlib
 import json
+import os
+import pickle
+import stat
 import sys
 from collections import deque
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+INDEX_CACHE_VERSION = 4
+INDEX_CACHE_MAX_ENTRIES = 8
+QUEUE_COMPACT_THRESHOLD = 4096
+
+FRAME_KEYS = ("x", "y", "width", "height")
+LAYOUT_KEYS = (
+    "layoutMode",
+    "layoutPositioning",
+    "layoutSizingHorizontal",
+    "layoutSizingVertical",
+    "layoutAlign",
+    "layoutGrow",
+    "itemSpacing",
+    "paddingLeft",
+    "paddingRight",
+    "paddingTop",
+    "paddingBottom",
+    "constraints",
+)
+STYLE_KEYS = (
+    "fills",
+    "strokes",
+    "strokeWeight",
+    "cornerRadius",
+    "topLeftRadius",
+    "topRightRadius",
+    "bottomLeftRadius",
+    "bottomRightRadius",
+    "effects",
+    "opacity",
+)
+TEXT_KEYS = (
+    "characters",
+    "textAutoResize",
+    "textAlignHorizontal",
+    "textAlignVertical",
+    "fontName",
+    "fontSize",
+    "textDecoration",
+    "textVariableName",
+)
+REFERENCE_KEYS = FRAME_KEYS + LAYOUT_KEYS + STYLE_KEYS + TEXT_KEYS
+REFERENCE_KEY_SET = frozenset(REFERENCE_KEYS)
+STREAM_NODE_KEYS = frozenset(("id", "name", "type") + REFERENCE_KEYS)
+
+BFS_TABLE_HEADER = "| BFS | Node ID | Node Name | Type | Parent | Path |"
+BFS_TABLE_DIVIDER = "| --- | --- | --- | --- | --- | --- |"
+CHILD_TABLE_HEADER = "| BFS | Node ID | Node Name | Type | Path |"
+CHILD_TABLE_DIVIDER = "| --- | --- | --- | --- | --- |"
+TREE_INDENTS = tuple("  " * depth for depth in range(512))
+
+SUMMARY_FIELDS = (
+    "bfs_index",
+    "node_id",
+    "node_name",
+    "figma_type",
+    "parent_node_id",
+    "depth",
+    "path",
+    "child_count",
+)
+
+
+@dataclass
+class NodeRecord:
+    __slots__ = (
+        "bfs_index",
+        "node_id",
+        "node_name",
+        "figma_type",
+        "parent_node_id",
+        "depth",
+        "path",
+        "child_node_ids",
+        "child_count",
+        "raw_props",
+    )
+
+    bfs_index: int
+    node_id: str
+    node_name: str
+    figma_type: str
+    parent_node_id: str | None
+    depth: int
+    path: str
+    child_node_ids: list[str]
+    child_count: int
+    raw_props: dict[str, Any]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Positional args unpickle faster than the default per-slot state dict.
+        return (NodeRecord, tuple(getattr(self, name) for name in self.__slots__))
 
 
 def load_json(path: str) -> Any:
+    if orjson is not None:
+        data = Path(path).read_bytes()
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson rejects NaN/Infinity literals that the stdlib parser accepts.
+            return json.loads(data)
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+def read_stream_value(event: str, value: Any, events: Any) -> Any:
+    if event not in ("start_map", "start_array"):
+        return value
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    while True:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        builder.event(event, value)
+        if depth == 0:
+            return builder.value
+        event, value = next(events)
+
+
+def skip_stream_value(event: str, events: Any) -> None:
+    depth = 0
+    while True:
+        if event in ("start_map", "start_array"):
+            depth += 1
+        elif event in ("end_map", "end_array"):
+            depth -= 1
+        if depth == 0:
+            return
+        event, _ = next(events)
+
+
+def read_pruned_tree(events: Any) -> dict[str, Any]:
+    event, _ = next(events)
+    if event != "start_map":
+        raise ValueError("Input JSON root must be an object.")
+
+    root: dict[str, Any] = {}
+    stack: list[Any] = [root]
+    for event, value in events:
+        top = stack[-1]
+        if isinstance(top, list):
+            if event == "start_map":
+                child: dict[str, Any] = {}
+                top.append(child)
+                stack.append(child)
+            elif event == "end_array":
+                stack.pop()
+            else:
+                skip_stream_value(event, events)
+        elif event == "map_key":
+            value_event, value_data = next(events)
+            if value == "children":
+                if value_event == "start_array":
+                    children: list[dict[str, Any]] = []
+                    top["children"] = children
+                    stack.append(children)
+                else:
+                    top.pop("children", None)
+                    skip_stream_value(value_event, events)
+            elif value in STREAM_NODE_KEYS:
+                top[value] = read_stream_value(value_event, value_data, events)
+            else:
+                skip_stream_value(value_event, events)
+        else:
+            stack.pop()
+    return root
+
+
+def load_json_streaming(path: str) -> Any:
+    with open(path, "rb") as f:
+        try:
+            return read_pruned_tree(ijson.basic_parse(f, use_float=True))
+        except ijson.JSONError:
+            pass
+        except StopIteration as exc:
+            raise ValueError(f"Invalid JSON input: {exc}") from exc
+    # ijson rejects the NaN/Infinity literals load_json accepts; let the default loader
+    # parse the file or report the real error.
+    return load_json(path)
+
+
 def as_str(value: Any, default: str = "") -> str:
     if value is None:
         return default
@@ -42,11 +237,19 @@ def normalize_name(name: str) -> str:
     return " ".join(name.split())
 
 
+def read_name(raw_node: dict[str, Any]) -> str | None:
+    name = raw_node.get("name")
+    if name is None:
+        return None
+    return normalize_name(str(name))
+
+
 def unique_path(path: str, seen_paths: dict[str, int]) -> str:
-    count = seen_paths.get(path, 0)
-    seen_paths[path] = count + 1
-    if count == 0:
+    count = seen_paths.get(path)
+    if count is None:
+        seen_paths[path] = 1
         return path
+    seen_paths[path] = count + 1
     return f"{path}#{count + 1}"
 
 
@@ -69,214 +272,335 @@ def resolve_node_id(
         prefix = parent_node_id if parent_node_id else "root"
         base_id = f"{prefix}::child-{child_index}"
 
-    count = seen_ids.get(base_id, 0)
-    seen_ids[base_id] = count + 1
-    if count == 0:
+    count = seen_ids.get(base_id)
+    if count is None:
+        seen_ids[base_id] = 1
         return base_id
+    seen_ids[base_id] = count + 1
     return f"{base_id}#{count + 1}"
 
 
-def build_index(input_path: str) -> dict[str, Any]:
-    root = load_json(input_path)
+def index_cache_dir() -> Path | None:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    cache_dir = Path(cache_home) / "figma_json_reader"
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        dir_stat = os.lstat(cache_dir)
+        # Cache files are unpickled, so only use a real directory owned by the current user
+        # and close it to everyone else.
+        if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid():
+            return None
+        if dir_stat.st_mode & 0o077:
+            os.chmod(cache_dir, 0o700)
+    except (OSError, AttributeError):
+        return None
+    return cache_dir
+
+
+def index_cache_key(source_file: str) -> tuple[Any, ...] | None:
+    try:
+        source_stat = os.stat(source_file)
+    except OSError:
+        return None
+    return (INDEX_CACHE_VERSION, source_file, source_stat.st_mtime_ns, source_stat.st_size)
+
+
+def index_cache_path(source_file: str) -> Path | None:
+    cache_dir = index_cache_dir()
+    if cache_dir is None:
+        return None
+    digest = hashlib.blake2b(source_file.encode("utf-8"), digest_size=16).hexdigest()
+    return cache_dir / f"{digest}.pkl"
+
+
+def read_index_cache(cache_path: Path, cache_key: tuple[Any, ...]) -> dict[str, Any] | None:
+    try:
+        with cache_path.open("rb") as f:
+            file_stat = os.fstat(f.fileno())
+            if not stat.S_ISREG(file_stat.st_mode) or file_stat.st_uid != os.getuid():
+                return None
+            stored_key, index = pickle.load(f)
+    except Exception:
+        return None
+    if stored_key != cache_key or not isinstance(index, dict):
+        return None
+    return index
+
+
+def write_index_cache(cache_path: Path, cache_key: tuple[Any, ...], index: dict[str, Any]) -> None:
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        with tmp_path.open("wb") as f:
+            pickle.dump((cache_key, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except (OSError, pickle.PicklingError, RecursionError):
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return
+    prune_index_cache(cache_path.parent)
+
+
+def prune_index_cache(cache_dir: Path) -> None:
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pkl"):
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    for _, stale_path in entries[INDEX_CACHE_MAX_ENTRIES:]:
+        try:
+            os.unlink(stale_path)
+        except OSError:
+            pass
+
+
+def build_index(input_path: str, use_cache: bool = True, stream: bool = False) -> dict[str, Any]:
+    source_file = str(Path(input_path).resolve())
+    # The index is tens of thousands of acyclic containers; pause the cyclic GC while it is
+    # parsed or unpickled instead of letting it rescan them on every allocation threshold.
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        cache_key = index_cache_key(source_file) if use_cache else None
+        cache_path = index_cache_path(source_file) if cache_key is not None else None
+        if cache_path is not None:
+            index = read_index_cache(cache_path, cache_key)
+            if index is not None:
+                return index
+
+        index = build_index_uncached(source_file, stream)
+        if cache_path is not None:
+            write_index_cache(cache_path, cache_key, index)
+        return index
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+
+def build_index_uncached(source_file: str, stream: bool = False) -> dict[str, Any]:
+    if stream and ijson is not None:
+        root = load_json_streaming(source_file)
+    else:
+        root = load_json(source_file)
     if not isinstance(root, dict):
         raise ValueError("Input JSON root must be an object.")
 
     seen_ids: dict[str, int] = {}
-    records: dict[str, dict[str, Any]] = {}
+    records: dict[str, NodeRecord] = {}
     bfs_ids: list[str] = []
+    node_names: list[str] = []
+    figma_types: list[str] = []
+    parent_node_ids: list[str | None] = []
+    depths: list[int] = []
+    paths: list[str] = []
+    child_counts: list[int] = []
     path_to_id: dict[str, str] = {}
-    children_map: dict[str, list[str]] = {}
     seen_paths: dict[str, int] = {}
 
-    root_name = normalize_name(as_str(root.get("name"), "Root"))
-    queue = deque([(root, None, 0, root_name, 0)])
+    root_name = read_name(root)
+    queue = [(root, None, 0, root_name if root_name is not None else "Root", 0, root_name)]
+    head = 0
 
-    while queue:
-        raw_node, parent_id, depth, raw_path, child_index = queue.popleft()
+    while head < len(queue):
+        raw_node, parent_id, depth, raw_path, child_index, name = queue[head]
+        head += 1
+        if head >= QUEUE_COMPACT_THRESHOLD and head * 2 >= len(queue):
+            del queue[:head]
+            head = 0
         path = unique_path(raw_path, seen_paths)
         node_id = resolve_node_id(raw_node, parent_id, child_index, seen_ids)
-        node_name = normalize_name(as_str(raw_node.get("name"), node_id))
-        node_type = as_str(raw_node.get("type"), "UNKNOWN")
+        node_name = name if name is not None else normalize_name(node_id)
+        node_type = sys.intern(as_str(raw_node.get("type"), "UNKNOWN"))
         children = get_children(raw_node)
 
         if parent_id is not None:
-            children_map.setdefault(parent_id, []).append(node_id)
-
-        record = {
-            "bfs_index": len(bfs_ids),
-            "node_id": node_id,
-            "node_name": node_name,
-            "figma_type": node_type,
-            "parent_node_id": parent_id,
-            "depth": depth,
-            "path": path,
-            "child_node_ids": [],
-            "child_count": 0,
-            "raw": raw_node,
-        }
-        records[node_id] = record
+            records[parent_id].child_node_ids.append(node_id)
+
+        # Positional construction and one pass over the node's own keys keep this hot path cheap.
+        records[node_id] = NodeRecord(
+            len(bfs_ids),
+            node_id,
+            node_name,
+            node_type,
+            parent_id,
+            depth,
+            path,
+            [],
+            len(children),
+            {key: value for key, value in raw_node.items() if key in REFERENCE_KEY_SET},
+        )
         bfs_ids.append(node_id)
+        node_names.append(node_name)
+        figma_types.append(node_type)
+        parent_node_ids.append(parent_id)
+        depths.append(depth)
+        paths.append(path)
+        child_counts.append(len(children))
         path_to_id[path] = node_id
 
         for idx, child in enumerate(children):
-            child_name = normalize_name(as_str(child.get("name"), f"child-{idx}"))
-            child_path = f"{path}/{child_name}"
-            queue.append((child, node_id, depth + 1, child_path, idx))
-
-    for node_id in bfs_ids:
-        child_ids = children_map.get(node_id, [])
-        child_ids.sort(key=lambda cid: records[cid]["bfs_index"])
-        records[node_id]["child_node_ids"] = child_ids
-        records[node_id]["child_count"] = len(child_ids)
+            child_name = read_name(child)
+            child_path = f"{path}/{child_name if child_name is not None else f'child-{idx}'}"
+            queue.append((child, node_id, depth + 1, child_path, idx, child_name))
 
     root_id = bfs_ids[0] if bfs_ids else ""
     return {
-        "source_file": str(Path(input_path).resolve()),
+        "source_file": source_file,
         "root_node_id": root_id,
         "total_nodes": len(bfs_ids),
         "records": records,
         "bfs_ids": bfs_ids,
+        "columns": {
+            "node_id": bfs_ids,
+            "node_name": node_names,
+            "figma_type": figma_types,
+            "parent_node_id": parent_node_ids,
+            "depth": depths,
+            "path": paths,
+            "child_count": child_counts,
+        },
         "path_to_id": path_to_id,
     }
 
 
-def summary(record: dict[str, Any]) -> dict[str, Any]:
+def find_raw_node(input_path: str, bfs_index: int) -> dict[str, Any]:
+    root = load_json(input_path)
+    if not isinstance(root, dict):
+        raise ValueError("Input JSON root must be an object.")
+
+    queue = deque([root])
+    position = 0
+    while queue:
+        raw_node = queue.popleft()
+        if position == bfs_index:
+            return raw_node
+        position += 1
+        queue.extend(get_children(raw_node))
+    raise IndexError(f"BFS index out of range: {bfs_index}")
+
+
+def summary(record: NodeRecord) -> dict[str, Any]:
     return {
-        "bfs_index": record.get("bfs_index"),
-        "node_id": record.get("node_id"),
-        "node_name": record.get("node_name"),
-        "figma_type": record.get("figma_type"),
-        "parent_node_id": record.get("parent_node_id"),
-        "depth": record.get("depth"),
-        "path": record.get("path"),
-        "child_count": record.get("child_count"),
+        "bfs_index": record.bfs_index,
+        "node_id": record.node_id,
+        "node_name": record.node_name,
+        "figma_type": record.figma_type,
+        "parent_node_id": record.parent_node_id,
+        "depth": record.depth,
+        "path": record.path,
+        "child_count": record.child_count,
     }
 
 
-def extract_node_reference(raw_node: dict[str, Any]) -> dict[str, Any]:
-    reference = {
-        "frame": {
-            "x": as_num(raw_node.get("x")),
-            "y": as_num(raw_node.get("y")),
-            "width": as_num(raw_node.get("width")),
-            "height": as_num(raw_node.get("height")),
-        },
-        "layout": {
-            "layoutMode": raw_node.get("layoutMode"),
-            "layoutPositioning": raw_node.get("layoutPositioning"),
-            "layoutSizingHorizontal": raw_node.get("layoutSizingHorizontal"),
-            "layoutSizingVertical": raw_node.get("layoutSizingVertical"),
-            "layoutAlign": raw_node.get("layoutAlign"),
-            "layoutGrow": raw_node.get("layoutGrow"),
-            "itemSpacing": raw_node.get("itemSpacing"),
-            "paddingLeft": raw_node.get("paddingLeft"),
-            "paddingRight": raw_node.get("paddingRight"),
-            "paddingTop": raw_node.get("paddingTop"),
-            "paddingBottom": raw_node.get("paddingBottom"),
-            "constraints": raw_node.get("constraints"),
-        },
-        "style": {
-            "fills": raw_node.get("fills"),
-            "strokes": raw_node.get("strokes"),
-            "strokeWeight": raw_node.get("strokeWeight"),
-            "cornerRadius": raw_node.get("cornerRadius"),
-            "topLeftRadius": raw_node.get("topLeftRadius"),
-            "topRightRadius": raw_node.get("topRightRadius"),
-            "bottomLeftRadius": raw_node.get("bottomLeftRadius"),
-            "bottomRightRadius": raw_node.get("bottomRightRadius"),
-            "effects": raw_node.get("effects"),
-            "opacity": raw_node.get("opacity"),
-        },
-        "text": {
-            "characters": raw_node.get("characters"),
-            "textAutoResize": raw_node.get("textAutoResize"),
-            "textAlignHorizontal": raw_node.get("textAlignHorizontal"),
-            "textAlignVertical": raw_node.get("textAlignVertical"),
-            "fontName": raw_node.get("fontName"),
-            "fontSize": raw_node.get("fontSize"),
-            "textDecoration": raw_node.get("textDecoration"),
-            "textVariableName": raw_node.get("textVariableName"),
-        },
+def summary_rows(index: dict[str, Any], start: int, end: int) -> list[dict[str, Any]]:
+    columns = index["columns"]
+    rows = zip(range(start, end), *(columns[field][start:end] for field in SUMMARY_FIELDS[1:]))
+    return [dict(zip(SUMMARY_FIELDS, row)) for row in rows]
+
+
+def extract_node_reference(raw_props: dict[str, Any]) -> dict[str, Any]:
+    get = raw_props.get
+    return {
+        "frame": {key: as_num(get(key)) for key in FRAME_KEYS},
+        "layout": {key: get(key) for key in LAYOUT_KEYS},
+        "style": {key: get(key) for key in STYLE_KEYS},
+        "text": {key: get(key) for key in TEXT_KEYS},
     }
-    return reference
+
+
+def escape_cell(value: str) -> str:
+    if "|" not in value:
+        return value
+    return value.replace("|", "\\|")
 
 
 def to_markdown_row(cols: list[str]) -> str:
-    escaped = [as_str(c).replace("|", "\\|") for c in cols]
-    return "| " + " | ".join(escaped) + " |"
+    return "| " + " | ".join(escape_cell(as_str(c)) for c in cols) + " |"
 
 
 def render_tree_lines(
     node_id: str,
-    records: dict[str, dict[str, Any]],
+    records: dict[str, NodeRecord],
     depth: int,
     max_depth: int | None,
-    lines: list[str],
+    write_line: Callable[[str], Any],
 ) -> None:
-    if node_id not in records:
-        return
-    if max_depth is not None and depth > max_depth:
-        return
+    stack = [(node_id, depth)]
+    while stack:
+        node_id, depth = stack.pop()
+        node = records.get(node_id)
+        if node is None:
+            continue
+        if max_depth is not None and depth > max_depth:
+            continue
+
+        indent = TREE_INDENTS[depth] if depth < len(TREE_INDENTS) else "  " * depth
+        write_line(
+            f"{indent}- [{node.bfs_index}] {node.node_name} (`{node.node_id}`) <{node.figma_type}>"
+        )
 
-    node = records[node_id]
-    indent = "  " * depth
-    lines.append(
-        f"{indent}- [{node['bfs_index']}] {node['node_name']} (`{node['node_id']}`) <{node['figma_type']}>"
-    )
+        if max_depth is not None and depth == max_depth and node.child_count > 0:
+            write_line(f"{indent}  - ...")
+            continue
 
-    if max_depth is not None and depth == max_depth and node["child_count"] > 0:
-        lines.append(f"{indent}  - ...")
-        return
+        for child_id in reversed(node.child_node_ids):
+            stack.append((child_id, depth + 1))
+
+
+def render_bfs_table(index: dict[str, Any], start: int, end: int, write_line: Callable[[str], Any]) -> None:
+    columns = index["columns"]
+    rows = zip(
+        range(start, end),
+        columns["node_id"][start:end],
+        columns["node_name"][start:end],
+        columns["figma_type"][start:end],
+        columns["parent_node_id"][start:end],
+        columns["path"][start:end],
+    )
 
-    for child_id in node["child_node_ids"]:
-        render_tree_lines(child_id, records, depth + 1, max_depth, lines)
+    write_line(BFS_TABLE_HEADER)
+    write_line(BFS_TABLE_DIVIDER)
+    for bfs_index, node_id, node_name, figma_type, parent_node_id, path in rows:
+        write_line(
+            f"| {bfs_index} | {escape_cell(node_id)} | {escape_cell(compact(node_name, 40))} "
+            f"| {escape_cell(figma_type)} | {escape_cell(as_str(parent_node_id, 'ROOT'))} "
+            f"| {escape_cell(compact(path, 60))} |"
+        )
 
 
-def render_skeleton_markdown(index: dict[str, Any], max_depth: int | None, limit: int | None) -> str:
+def render_skeleton_markdown(
+    index: dict[str, Any],
+    max_depth: int | None,
+    limit: int | None,
+    write_line: Callable[[str], Any],
+) -> None:
     records = index["records"]
     bfs_ids = index["bfs_ids"]
     root_id = index["root_node_id"]
 
-    lines: list[str] = []
-    lines.append("# JSON Skeleton")
-    lines.append("")
-    lines.append(f"- Source: `{index['source_file']}`")
-    lines.append(f"- Root node id: `{root_id}`")
-    lines.append(f"- Total nodes: `{index['total_nodes']}`")
-    lines.append("")
-    lines.append("## Tree Structure")
-    lines.append("")
-    render_tree_lines(root_id, records, 0, max_depth, lines)
-    lines.append("")
-    lines.append("## BFS Index")
-    lines.append("")
-    lines.append(to_markdown_row(["BFS", "Node ID", "Node Name", "Type", "Parent", "Path"]))
-    lines.append(to_markdown_row(["---", "---", "---", "---", "---", "---"]))
-
-    shown_ids = bfs_ids
-    if limit is not None:
-        shown_ids = bfs_ids[:limit]
-
-    for node_id in shown_ids:
-        node = records[node_id]
-        lines.append(
-            to_markdown_row(
-                [
-                    str(node["bfs_index"]),
-                    node["node_id"],
-                    compact(node["node_name"], 40),
-                    node["figma_type"],
-                    as_str(node["parent_node_id"], "ROOT"),
-                    compact(node["path"], 60),
-                ]
-            )
-        )
+    write_line("# JSON Skeleton")
+    write_line("")
+    write_line(f"- Source: `{index['source_file']}`")
+    write_line(f"- Root node id: `{root_id}`")
+    write_line(f"- Total nodes: `{index['total_nodes']}`")
+    write_line("")
+    write_line("## Tree Structure")
+    write_line("")
+    render_tree_lines(root_id, records, 0, max_depth, write_line)
+    write_line("")
+    write_line("## BFS Index")
+    write_line("")
+    shown = range(len(bfs_ids))[:limit]
+    render_bfs_table(index, shown.start, shown.stop, write_line)
 
     if limit is not None and limit < len(bfs_ids):
-        lines.append("")
-        lines.append(f"_Showing first {limit} / {len(bfs_ids)} nodes._")
-
-    return "\n".join(lines)
+        write_line("")
+        write_line(f"_Showing first {limit} / {len(bfs_ids)} nodes._")
 
 
 def select_record(
@@ -284,15 +608,16 @@ def select_record(
     node_id: str | None,
     bfs_index: int | None,
     node_path: str | None,
-) -> dict[str, Any]:
+) -> NodeRecord:
     records = index["records"]
     bfs_ids = index["bfs_ids"]
     path_to_id = index["path_to_id"]
 
     if node_id is not None:
-        if node_id not in records:
-            raise KeyError(f"Node id not found: {node_id}")
-        return records[node_id]
+        try:
+            return records[node_id]
+        except KeyError:
+            raise KeyError(f"Node id not found: {node_id}") from None
 
     if bfs_index is not None:
         if bfs_index < 0 or bfs_index >= len(bfs_ids):
@@ -300,50 +625,50 @@ def select_record(
         return records[bfs_ids[bfs_index]]
 
     if node_path is not None:
-        if node_path not in path_to_id:
-            raise KeyError(f"Node path not found: {node_path}")
-        return records[path_to_id[node_path]]
+        try:
+            return records[path_to_id[node_path]]
+        except KeyError:
+            raise KeyError(f"Node path not found: {node_path}") from None
 
     raise ValueError("One selector is required: --node-id, --bfs-index, or --node-path")
 
 
-def render_node_markdown(payload: dict[str, Any]) -> str:
+def render_node_markdown(payload: dict[str, Any], write_line: Callable[[str], Any]) -> None:
     node = payload["node"]
     parent = payload["parent"]
     children = payload["children"]
     reference = payload["reference"]
 
-    lines: list[str] = []
-    lines.append(f"# Node Context: {node['node_name']} (`{node['node_id']}`)")
-    lines.append("")
-    lines.append("## Node Summary")
-    lines.append("")
-    lines.append(f"- BFS index: `{node['bfs_index']}`")
-    lines.append(f"- Figma type: `{node['figma_type']}`")
-    lines.append(f"- Parent: `{node['parent_node_id'] or 'ROOT'}`")
-    lines.append(f"- Path: `{node['path']}`")
-    lines.append(f"- Child count: `{node['child_count']}`")
-    lines.append("")
-
-    lines.append("## Parent Summary")
-    lines.append("")
+    write_line(f"# Node Context: {node['node_name']} (`{node['node_id']}`)")
+    write_line("")
+    write_line("## Node Summary")
+    write_line("")
+    write_line(f"- BFS index: `{node['bfs_index']}`")
+    write_line(f"- Figma type: `{node['figma_type']}`")
+    write_line(f"- Parent: `{node['parent_node_id'] or 'ROOT'}`")
+    write_line(f"- Path: `{node['path']}`")
+    write_line(f"- Child count: `{node['child_count']}`")
+    write_line("")
+
+    write_line("## Parent Summary")
+    write_line("")
     if parent is None:
-        lines.append("- `ROOT` node (no parent).")
+        write_line("- `ROOT` node (no parent).")
     else:
-        lines.append(
+        write_line(
             f"- [{parent['bfs_index']}] {parent['node_name']} (`{parent['node_id']}`) <{parent['figma_type']}>"
         )
-    lines.append("")
+    write_line("")
 
-    lines.append("## Direct Children")
-    lines.append("")
+    write_line("## Direct Children")
+    write_line("")
     if not children:
-        lines.append("- No direct children.")
+        write_line("- No direct children.")
     else:
-        lines.append(to_markdown_row(["BFS", "Node ID", "Node Name", "Type", "Path"]))
-        lines.append(to_markdown_row(["---", "---", "---", "---", "---"]))
+        write_line(CHILD_TABLE_HEADER)
+        write_line(CHILD_TABLE_DIVIDER)
         for child in children:
-            lines.append(
+            write_line(
                 to_markdown_row(
                     [
                         str(child["bfs_index"]),
@@ -354,116 +679,135 @@ def render_node_markdown(payload: dict[str, Any]) -> str:
                     ]
                 )
             )
-    lines.append("")
-
-    lines.append("## Reference Properties")
-    lines.append("")
-    lines.append("```json")
-    lines.append(json.dumps(reference, ensure_ascii=False, indent=2))
-    lines.append("```")
-    return "\n".join(lines)
-
-
-def render_batch_markdown(items: list[dict[str, Any]], total_nodes: int, start: int, count: int) -> str:
-    lines: list[str] = []
-    lines.append("# BFS Batch")
-    lines.append("")
-    lines.append(f"- Start index: `{start}`")
-    lines.append(f"- Requested count: `{count}`")
-    lines.append(f"- Returned count: `{len(items)}`")
-    lines.append(f"- Total nodes: `{total_nodes}`")
-    lines.append("")
-    lines.append(to_markdown_row(["BFS", "Node ID", "Node Name", "Type", "Parent", "Path"]))
-    lines.append(to_markdown_row(["---", "---", "---", "---", "---", "---"]))
-    for node in items:
-        lines.append(
-            to_markdown_row(
-                [
-                    str(node["bfs_index"]),
-                    node["node_id"],
-                    compact(node["node_name"], 40),
-                    node["figma_type"],
-                    as_str(node["parent_node_id"], "ROOT"),
-                    compact(node["path"], 60),
-                ]
-            )
-        )
-    return "\n".join(lines)
+    write_line("")
+
+    write_line("## Reference Properties")
+    write_line("")
+    write_line("```json")
+    write_line(json.dumps(reference, ensure_ascii=False, indent=2))
+    write_line("```")
+
+
+def render_batch_markdown(
+    index: dict[str, Any],
+    start: int,
+    end: int,
+    count: int,
+    write_line: Callable[[str], Any],
+) -> None:
+    total_nodes = index["total_nodes"]
+    write_line("# BFS Batch")
+    write_line("")
+    write_line(f"- Start index: `{start}`")
+    write_line(f"- Requested count: `{count}`")
+    write_line(f"- Returned count: `{max(0, min(end, total_nodes) - start)}`")
+    write_line(f"- Total nodes: `{total_nodes}`")
+    write_line("")
+    render_bfs_table(index, start, end, write_line)
+
+
+def prepare_output_path(output_path: str) -> Path:
+    out = Path(output_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    return out
+
+
+def dump_json_bytes(payload: Any) -> bytes:
+    return orjson.dumps(
+        payload,
+        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE,
+    )
+
+
+def write_json(payload: Any, fp: Any) -> None:
+    json.dump(payload, fp, ensure_ascii=False, indent=2)
+    fp.write("\n")
 
 
-def emit_output(payload: Any, output_path: str | None, fmt: str) -> None:
-    if fmt == "json":
-        text = json.dumps(payload, ensure_ascii=False, indent=2)
+def emit_json(payload: Any, output_path: str | None) -> None:
+    data = None
+    if orjson is not None:
+        try:
+            data = dump_json_bytes(payload)
+        except orjson.JSONEncodeError:
+            # e.g. integers wider than 64 bits kept exact by the stdlib fallback in load_json.
+            data = None
+
+    if output_path:
+        out = prepare_output_path(output_path)
+        if data is not None:
+            out.write_bytes(data)
+        else:
+            with out.open("w", encoding="utf-8") as f:
+                write_json(payload, f)
+        print(f"Wrote output -> {out.resolve()}")
+    elif data is not None:
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
     else:
-        text = as_str(payload)
+        write_json(payload, sys.stdout)
 
+
+def emit_markdown(render: Callable[[Callable[[str], Any]], None], output_path: str | None) -> None:
     if output_path:
-        out = Path(output_path)
-        out.parent.mkdir(parents=True, exist_ok=True)
-        out.write_text(text + ("\n" if not text.endswith("\n") else ""), encoding="utf-8")
+        out = prepare_output_path(output_path)
+        with out.open("w", encoding="utf-8") as f:
+            render(lambda text: f.write(text + "\n"))
         print(f"Wrote output -> {out.resolve()}")
     else:
-        print(text)
+        render(lambda text: sys.stdout.write(text + "\n"))
 
 
 def cmd_skeleton(args: argparse.Namespace) -> int:
-    index = build_index(args.input)
-    records = index["records"]
-    bfs_ids = index["bfs_ids"]
+    index = build_index(args.input, use_cache=not args.no_cache, stream=args.stream)
 
     if args.format == "json":
         payload = {
             "source_file": index["source_file"],
             "root_node_id": index["root_node_id"],
             "total_nodes": index["total_nodes"],
-            "nodes": [summary(records[node_id]) for node_id in bfs_ids],
+            "nodes": summary_rows(index, 0, index["total_nodes"]),
         }
-        emit_output(payload, args.output, "json")
+        emit_json(payload, args.output)
         return 0
 
-    markdown = render_skeleton_markdown(index, args.max_depth, args.limit)
-    emit_output(markdown, args.output, "markdown")
+    emit_markdown(partial(render_skeleton_markdown, index, args.max_depth, args.limit), args.output)
     return 0
 
 
 def cmd_node(args: argparse.Namespace) -> int:
-    index = build_index(args.input)
+    index = build_index(args.input, use_cache=not args.no_cache, stream=args.stream)
     records = index["records"]
 
     node = select_record(index, args.node_id, args.bfs_index, args.node_path)
-    parent = records.get(node["parent_node_id"]) if node.get("parent_node_id") else None
-    children = [records[child_id] for child_id in node["child_node_ids"] if child_id in records]
+    parent = records.get(node.parent_node_id) if node.parent_node_id else None
+    children = [records[child_id] for child_id in node.child_node_ids if child_id in records]
 
     payload = {
         "node": summary(node),
         "parent": summary(parent) if parent else None,
         "children": [summary(child) for child in children],
-        "reference": extract_node_reference(node["raw"]),
+        "reference": extract_node_reference(node.raw_props),
     }
 
-    if args.raw:
-        payload["raw"] = node["raw"]
-
     if args.format == "json":
-        emit_output(payload, args.output, "json")
+        if args.raw:
+            payload["raw"] = find_raw_node(args.input, node.bfs_index)
+        emit_json(payload, args.output)
         return 0
 
-    markdown = render_node_markdown(payload)
-    emit_output(markdown, args.output, "markdown")
+    emit_markdown(partial(render_node_markdown, payload), args.output)
     return 0
 
 
 def cmd_batch(args: argparse.Namespace) -> int:
-    index = build_index(args.input)
-    records = index["records"]
-    bfs_ids = index["bfs_ids"]
+    index = build_index(args.input, use_cache=not args.no_cache, stream=args.stream)
 
     start = max(0, args.start)
     end = max(start, start + max(0, args.count))
-    selected_ids = bfs_ids[start:end]
-    items = [summary(records[node_id]) for node_id in selected_ids]
 
     if args.format == "json":
+        items = summary_rows(index, start, end)
         payload = {
             "source_file": index["source_file"],
             "start": start,
@@ -472,11 +816,10 @@ def cmd_batch(args: argparse.Namespace) -> int:
             "total_nodes": index["total_nodes"],
             "items": items,
         }
-        emit_output(payload, args.output, "json")
+        emit_json(payload, args.output)
         return 0
 
-    markdown = render_batch_markdown(items, index["total_nodes"], start, args.count)
-    emit_output(markdown, args.output, "markdown")
+    emit_markdown(partial(render_batch_markdown, index, start, end, args.count), args.output)
     return 0
 
 
@@ -490,6 +833,10 @@ def build_parser() -> argparse.ArgumentParser:
     p_skeleton.add_argument("--input", required=True, help="Path to Figma JSON file.")
     p_skeleton.add_argument("--format", choices=["markdown", "json"], default="markdown")
     p_skeleton.add_argument("--output", help="Optional output path.")
+    p_skeleton.add_argument("--no-cache", action="store_true", help="Skip the on-disk index cache.")
+    p_skeleton.add_argument(
+        "--stream", action="store_true", help="Parse the input incrementally with ijson (if installed)."
+    )
     p_skeleton.add_argument("--max-depth", type=int, help="Optional max depth for tree rendering.")
     p_skeleton.add_argument("--limit", type=int, help="Optional BFS row limit for markdown/json list.")
     p_skeleton.set_defaults(func=cmd_skeleton)
@@ -503,6 +850,10 @@ def build_parser() -> argparse.ArgumentParser:
     p_node.add_argument("--raw", action="store_true", help="Include full raw node in JSON output.")
     p_node.add_argument("--format", choices=["markdown", "json"], default="markdown")
     p_node.add_argument("--output", help="Optional output path.")
+    p_node.add_argument("--no-cache", action="store_true", help="Skip the on-disk index cache.")
+    p_node.add_argument(
+        "--stream", action="store_true", help="Parse the input incrementally with ijson (if installed)."
+    )
     p_node.set_defaults(func=cmd_node)
 
     p_batch = sub.add_parser("batch", help="Read BFS batch of nodes.")
@@ -511,6 +862,10 @@ def build_parser() -> argparse.ArgumentParser:
     p_batch.add_argument("--count", type=int, default=10, help="Number of nodes to return.")
     p_batch.add_argument("--format", choices=["markdown", "json"], default="markdown")
     p_batch.add_argument("--output", help="Optional output path.")
+    p_batch.add_argument("--no-cache", action="store_true", help="Skip the on-disk index cache.")
+    p_batch.add_argument(
+        "--stream", action="store_true", help="Parse the input incrementally with ijson (if installed)."
+    )
     p_batch.set_defaults(func=cmd_batch)
 
     return parser